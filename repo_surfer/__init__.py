@@ -9,10 +9,32 @@ __version__ = "0.1.0"
 __author__ = "Your Name <your.email@example.com>"
 __license__ = "MIT"
 
-# Import main components to make them available at the package level
+import importlib
+
+# The CLI is light and imported eagerly: a lazy `cli` attribute would be
+# shadowed by the `repo_surfer.cli` submodule once that has been imported
 from .cli import cli
-from .github_handler import GitHubHandler
-from .llm_manager import LLMManager
-from .memory_manager import MemoryManager
+
+# The other main components are resolved lazily (PEP 562) so that importing the
+# package, or running `repo-surfer --help`, doesn't pull in github/git/chromadb/requests
+_LAZY_ATTRS = {
+    "GitHubHandler": ".github_handler",
+    "LLMManager": ".llm_manager",
+    "MemoryManager": ".memory_manager",
+}
 
 __all__ = ["cli", "GitHubHandler", "LLMManager", "MemoryManager"]
+
+
+def __getattr__(name):
+    """Import main components on first access"""
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(_LAZY_ATTRS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -5,7 +5,6 @@ import os
 import sys
 from pathlib import Path
 from dotenv import load_dotenv
-from .cli import cli
 
 def main():
     """Main entry point"""
@@ -14,6 +13,9 @@ def main():
     if env_path.exists():
         load_dotenv(dotenv_path=env_path)
     
+    # Import the CLI only after the environment is loaded
+    from .cli import cli
+
     # Run 
     cli()
 
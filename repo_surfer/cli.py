@@ -2,11 +2,215 @@
 Command-line interface for RepoSurfer
 """
 import click
-from typing import Optional, Dict, Any
+import functools
+from typing import TYPE_CHECKING, Optional, Dict, Any
 from pathlib import Path
-from datetime import datetime
-from .memory_manager import MemoryManager
-import subprocess
+import os
+
+if TYPE_CHECKING:
+    import subprocess
+    from rich.console import Console
+
+# Parallelism for fetching submodules during clone
+_DEFAULT_JOBS = max(4, os.cpu_count() or 4)
+
+# Clones made by `analyze` are kept here and refreshed with a shallow fetch
+_CLONE_CACHE_ROOT = Path.home() / '.cache' / 'repo-surfer'
+# Total size the clone cache may grow to before the least recently used
+# clones are evicted; override with REPO_SURFER_CACHE_BUDGET (bytes)
+_CLONE_CACHE_BUDGET = 2 * 1024 ** 3
+
+# Bytes read from `git cat-file` at a time when counting lines
+_BLOB_CHUNK_SIZE = 64 * 1024
+
+# Directories that aren't typically useful to show in `structure`
+_SKIP_DIRS = frozenset({'__pycache__', '.git', '.github', '.idea', 'venv', 'env', 'node_modules'})
+
+@functools.lru_cache(maxsize=1)
+def _console() -> 'Console':
+    """Get the Rich console shared by all commands"""
+    from rich.console import Console
+    
+    return Console()
+
+def _git(*args: str, cwd: Path) -> 'subprocess.CompletedProcess':
+    """Run a git command in `cwd` and capture its output"""
+    import subprocess
+    
+    return subprocess.run(
+        ['git', *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=False
+    )
+
+def _cache_dir_for(url: str) -> Path:
+    """Get the clone cache directory for a repository URL"""
+    import hashlib
+    
+    normalized = url.strip().rstrip('/')
+    if normalized.endswith('.git'):
+        normalized = normalized[:-4]
+    key = hashlib.sha1(normalized.lower().encode()).hexdigest()[:16]
+    return _CLONE_CACHE_ROOT / key
+
+def _dir_size(path: Path) -> int:
+    """Get the total size of the files under a directory"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+def _clone_size(path: Path, refresh: bool = False) -> int:
+    """
+    Get the size of a cached clone from its size record, next to the clone.
+    
+    The size is only recomputed when `refresh` is set or there is no record yet.
+    """
+    record = path.with_name(path.name + '.size')
+    if not refresh:
+        try:
+            return int(record.read_text())
+        except (OSError, ValueError):
+            pass
+    size = _dir_size(path)
+    try:
+        record.write_text(str(size))
+    except OSError:
+        pass
+    return size
+
+def _evict_clone_cache(keep: Path) -> None:
+    """Remove the least recently used cached clones until the cache fits its budget"""
+    import shutil
+    
+    budget = int(os.getenv('REPO_SURFER_CACHE_BUDGET', _CLONE_CACHE_BUDGET))
+    entries = [entry for entry in _CLONE_CACHE_ROOT.iterdir() if entry.is_dir()]
+    # Only the clone that was just cloned or updated can have changed size
+    sizes = {entry: _clone_size(entry, refresh=entry == keep) for entry in entries}
+    total = sum(sizes.values())
+    
+    # Oldest first, by the mtime bumped each time a clone is used
+    for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+        if total <= budget:
+            break
+        if entry == keep:
+            continue
+        shutil.rmtree(entry, ignore_errors=True)
+        try:
+            entry.with_name(entry.name + '.size').unlink()
+        except OSError:
+            pass
+        total -= sizes[entry]
+
+def _remote_url(cwd: Path) -> str:
+    """Get the origin remote URL, or 'Unknown' if there isn't one"""
+    return _git('config', '--get', 'remote.origin.url', cwd=cwd).stdout.strip() or "Unknown"
+
+class _BatchGit:
+    """
+    Long-lived `git cat-file --batch` process for reading many blobs.
+    
+    Each lookup is a line written to the pipe instead of a new git process.
+    """
+    
+    def __init__(self, cwd: Path):
+        self.cwd = cwd
+        self.process = None
+    
+    def __enter__(self) -> '_BatchGit':
+        import subprocess
+        
+        self.process = subprocess.Popen(
+            ['git', 'cat-file', '--batch=%(objecttype) %(objectsize)'],
+            cwd=self.cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        if self.process is not None:
+            self.process.stdin.close()
+            self.process.stdout.close()
+            self.process.wait()
+            self.process = None
+    
+    def count_lines(self, rev: bytes) -> Optional[int]:
+        """Count the newlines in blob `rev` (e.g. b'HEAD:path'), or None if it is not a blob"""
+        # Requests are newline-terminated, so such a name would desync the pipe
+        if b'\n' in rev:
+            return None
+        self.process.stdin.write(rev + b'\n')
+        self.process.stdin.flush()
+        
+        # Header is "<type> <size>", or "<rev> missing" / "<rev> ambiguous" with
+        # no content following; <rev> may itself contain spaces
+        header = self.process.stdout.readline().split(b' ')
+        if len(header) != 2 or not header[1].strip().isdigit():
+            return None
+        is_blob = header[0] == b'blob'
+        # Read the object in fixed-size chunks so large files are never held in
+        # memory; non-blobs are still read to keep the pipe in sync
+        remaining = int(header[1])
+        lines = 0
+        while remaining:
+            chunk = self.process.stdout.read(min(remaining, _BLOB_CHUNK_SIZE))
+            if not chunk:
+                break
+            lines += chunk.count(b'\n')
+            remaining -= len(chunk)
+        self.process.stdout.read(1)  # trailing newline
+        return lines if is_blob else None
+
+def _count_files_and_lines(repo_dir: Path):
+    """
+    Count tracked files and their lines at HEAD.
+    
+    `git ls-files` is streamed path by path straight into a cat-file batch
+    process, so the file list is never buffered in memory. Paths are read
+    NUL-separated (-z) as raw bytes, since the default output quotes
+    non-ASCII names.
+    """
+    import subprocess
+    
+    file_count = 0
+    line_count = 0
+    with subprocess.Popen(
+        ['git', 'ls-files', '-z'],
+        cwd=repo_dir,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL
+    ) as process, _BatchGit(repo_dir) as batch:
+        pending = b''
+        for chunk in iter(lambda: process.stdout.read1(65536), b''):
+            *paths, pending = (pending + chunk).split(b'\0')
+            for path in paths:
+                file_count += 1
+                lines = batch.count_lines(b'HEAD:' + path)
+                if lines is not None:
+                    line_count += lines
+    return file_count, line_count
+
+def _commit_count(repo_dir: Path) -> str:
+    """Get the number of commits reachable from HEAD"""
+    import subprocess
+    
+    with subprocess.Popen(
+        ['git', 'rev-list', '--count', 'HEAD'],
+        cwd=repo_dir,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True
+    ) as process:
+        count = process.stdout.readline().strip()
+    return count if process.returncode == 0 and count else "Unknown"
 
 @click.group(invoke_without_command=True)
 @click.option('--debug/--no-debug', default=False, help='Enable debug mode')
@@ -32,16 +236,14 @@ def analyze(ctx: click.Context, repo_path: str):
         repo-surfer analyze user/repo            # Analyze GitHub repository
         repo-surfer analyze https://github.com/user/repo
     """
-    from pathlib import Path
     import subprocess
     from urllib.parse import urlparse
-    import os
     import json
-    from rich.console import Console
+    from concurrent.futures import ThreadPoolExecutor
     from rich.table import Table
     from rich.progress import Progress
     
-    console = Console()
+    console = _console()
     
     try:
         # Check if it's a local path
@@ -56,73 +258,73 @@ def analyze(ctx: click.Context, repo_path: str):
                 click.echo("Error: Invalid repository path or URL", err=True)
                 return
                 
-            # Clone the repository to a temporary directory
-            import tempfile
-            temp_dir = tempfile.mkdtemp(prefix='repo-surfer-')
-            repo_dir = Path(temp_dir) / repo_path.split('/')[-1]
-            
             if not repo_path.startswith('http'):
                 repo_path = f"https://github.com/{repo_path}.git"
             
-            with console.status(f"[bold green]Cloning repository {repo_path}...") as status:
-                result = subprocess.run(
-                    ['git', 'clone', '--depth', '1', repo_path, str(repo_dir)],
-                    capture_output=True,
-                    text=True
-                )
-                
+            # Reuse the cached clone of this repository if there is one
+            repo_dir = _cache_dir_for(repo_path)
+            if (repo_dir / '.git').exists():
+                with console.status(f"[bold green]Updating cached clone of {repo_path}...") as status:
+                    result = _git('fetch', '--depth', '1', 'origin', 'HEAD', cwd=repo_dir)
+                    if result.returncode == 0:
+                        result = _git('reset', '--hard', 'FETCH_HEAD', cwd=repo_dir)
+                    if result.returncode == 0:
+                        result = _git(
+                            'submodule', 'update', '--init', '--recursive',
+                            '--depth', '1', f'--jobs={_DEFAULT_JOBS}', cwd=repo_dir
+                        )
+                    
                 if result.returncode != 0:
-                    console.print(f"[red]Error cloning repository: {result.stderr}")
-                    return
+                    console.print(f"[yellow]Could not update cached clone, using it as is: {result.stderr.strip()}[/yellow]")
+            else:
+                repo_dir.parent.mkdir(parents=True, exist_ok=True)
+                with console.status(f"[bold green]Cloning repository {repo_path}...") as status:
+                    result = subprocess.run(
+                        ['git', '-c', f'submodule.fetchJobs={_DEFAULT_JOBS}', 'clone',
+                         '--depth', '1', '--filter=blob:none',
+                         '--recurse-submodules', f'--jobs={_DEFAULT_JOBS}',
+                         repo_path, str(repo_dir)],
+                        capture_output=True,
+                        text=True
+                    )
+                    
+                    if result.returncode != 0:
+                        import shutil
+                        shutil.rmtree(repo_dir, ignore_errors=True)
+                        console.print(f"[red]Error cloning repository: {result.stderr}")
+                        return
+            
+            # Mark the clone as recently used, then keep the cache within budget
+            os.utime(repo_dir)
+            _evict_clone_cache(keep=repo_dir)
         
         # Analyze the repository
         with console.status("[bold green]Analyzing repository...") as status:
-            # Get repository info
-            result = subprocess.run(
-                ['git', 'remote', '-v'],
-                cwd=repo_dir,
-                capture_output=True,
-                text=True
-            )
-            remote_url = result.stdout.split('\n')[0].split('\t')[1].split(' ')[0] if result.returncode == 0 else "Unknown"
-            
-            # Get commit count
-            result = subprocess.run(
-                ['git', 'rev-list', '--count', 'HEAD'],
-                cwd=repo_dir,
-                capture_output=True,
-                text=True
-            )
-            commit_count = result.stdout.strip() if result.returncode == 0 else "Unknown"
-            
-            # Get file count and sizes
-            result = subprocess.run(
-                ['git', 'ls-files'],
-                cwd=repo_dir,
-                capture_output=True,
-                text=True
-            )
-            files = result.stdout.splitlines() if result.returncode == 0 else []
-            file_count = len(files)
-            
-            # Get language stats
-            result = subprocess.run(
-                ['git', 'ls-files', '|', 'xargs', 'wc', '-l'],
-                cwd=repo_dir,
-                shell=True,
-                capture_output=True,
-                text=True
-            )
-            total_lines = result.stdout.split('\n')[-2].strip().split()[0] if result.returncode == 0 and result.stdout.strip() else "Unknown"
-            
-            # Get recent commits
-            result = subprocess.run(
-                ['git', 'log', '--pretty=format:%h - %s (%cr) <%an>', '-n', '5'],
-                cwd=repo_dir,
-                capture_output=True,
-                text=True
-            )
-            recent_commits = result.stdout.split('\n') if result.returncode == 0 else []
+            # Run the independent git queries concurrently rather than one after another
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                remote_future = executor.submit(_remote_url, repo_dir)
+                count_future = executor.submit(_commit_count, repo_dir)
+                # Count files and lines by streaming blobs through a single cat-file
+                # process instead of piping through a shell, xargs and wc
+                files_future = executor.submit(_count_files_and_lines, repo_dir)
+                log_future = executor.submit(
+                    _git, 'log', '--pretty=format:%h - %s (%cr) <%an>', '-n', '5', cwd=repo_dir
+                )
+                
+                # Get repository info
+                remote_url = remote_future.result()
+                
+                # Get commit count
+                commit_count = count_future.result()
+                
+                # Get file count and lines
+                file_count, total_lines = files_future.result()
+                if not file_count:
+                    total_lines = "Unknown"
+                
+                # Get recent commits
+                result = log_future.result()
+                recent_commits = result.stdout.split('\n') if result.returncode == 0 else []
         
         # Display results
         console.print("\n[bold blue]Repository Analysis[/bold blue]")
@@ -151,18 +353,27 @@ def analyze(ctx: click.Context, repo_path: str):
 @cli.command()
 @click.argument('repo_url')
 @click.option('--output-dir', '-o', type=click.Path(), default='.', help='Output directory for cloned repository')
+@click.option('--depth', type=int, default=1, help='Number of commits of history to fetch')
+@click.option('--filter', 'filter_spec', type=click.Choice(['none', 'blob:none', 'tree:0']), default='blob:none',
+              help='Partial clone filter; blobs/trees are fetched on demand')
+@click.option('--full-history', is_flag=True, default=False, help='Fetch the full history instead of a shallow clone')
+@click.option('--jobs', '-j', type=int, default=_DEFAULT_JOBS, show_default=True,
+              help='Number of submodules fetched in parallel')
 @click.pass_context
-def clone(ctx: click.Context, repo_url: str, output_dir: str):
+def clone(ctx: click.Context, repo_url: str, output_dir: str, depth: int, filter_spec: str, full_history: bool, jobs: int):
     """
     Clone a GitHub repository.
     
+    By default only the latest commit is fetched (--depth 1) as a blobless
+    partial clone (--filter blob:none). Use --full-history and --filter none
+    for a regular full clone. Submodules are cloned as well, --jobs at a time.
+    
     Example:
         repo-surfer clone https://github.com/username/repo.git
         repo-surfer clone git@github.com:username/repo.git --output-dir ./my-repo
+        repo-surfer clone https://github.com/username/repo.git --full-history --filter none
     """
-    import os
     import subprocess
-    from pathlib import Path
     from urllib.parse import urlparse
     
     try:
@@ -180,9 +391,19 @@ def clone(ctx: click.Context, repo_url: str, output_dir: str):
         
         click.echo(f"Cloning repository: {repo_url} to {output_path}")
         
+        # Build the clone command
+        args = ['git', '-c', f'submodule.fetchJobs={jobs}', 'clone', '--recurse-submodules', f'--jobs={jobs}']
+        if not full_history:
+            args += ['--depth', str(depth)]
+            if depth == 1:
+                args.append('--single-branch')
+        if filter_spec != 'none':
+            args += ['--filter', filter_spec]
+        args += [repo_url, str(output_path)]
+        
         # Run git clone
         result = subprocess.run(
-            ['git', 'clone', repo_url, str(output_path)],
+            args,
             capture_output=True,
             text=True
         )
@@ -222,92 +443,122 @@ def structure(ctx: click.Context, repo_path: str, depth: int, show_hidden: bool)
         repo-surfer structure . --depth 2          # Limit depth to 2 levels
         repo-surfer structure . --show-hidden      # Include hidden files/directories
     """
-    from rich.console import Console
     from rich.tree import Tree
     from rich.text import Text
-    import os
-    from pathlib import Path
+    from concurrent.futures import ThreadPoolExecutor
     
-    console = Console()
+    console = _console()
     repo_path = Path(repo_path).resolve()
     
-    def get_size(path: Path) -> str:
-        """Get human-readable size of a file or directory"""
-        if path.is_file():
-            size = path.stat().st_size
-        else:
-            size = sum(f.stat().st_size for f in path.glob('**/*') if f.is_file())
-            
-        # Convert to human-readable format
+    def format_size(size: float) -> str:
+        """Convert a byte count to a human-readable size"""
         for unit in ['B', 'KB', 'MB', 'GB']:
             if size < 1024:
                 return f"{size:.1f} {unit}"
             size /= 1024
         return f"{size:.1f} TB"
     
-    def should_skip(path: Path) -> bool:
-        """Determine if a path should be skipped"""
-        # Skip hidden files/directories unless explicitly requested
-        if not show_hidden and path.name.startswith('.'):
-            return True
-        # Skip common directories that aren't typically useful to show
-        skip_dirs = {'__pycache__', '.git', '.github', '.idea', 'venv', 'env', 'node_modules'}
-        if path.name in skip_dirs:
-            return True
-        return False
-    
-    def build_tree(path: Path, tree: Tree, current_depth: int = 0):
-        """Recursively build the directory tree"""
-        if should_skip(path):
-            return
-            
-        if path.is_file():
-            size = get_size(path)
-            tree.add(f"{path.name} [dim]({size})[/]")
-            return
-            
-        # For directories, add a node and recurse
-        if current_depth >= depth:
-            return
-            
-        dir_node = tree.add(f"[bold]{path.name}/[/]")
+    def should_skip(name: str) -> bool:
+        """Determine if an entry with this name should be skipped"""
+        # Skip hidden files/directories unless explicitly requested, and
+        # common directories that aren't typically useful to show
+        return (not show_hidden and name and name[0] == '.') or name in _SKIP_DIRS
+    
+    def scan_dir(path: str, name: str, current_depth: int = 0, executor: Optional[ThreadPoolExecutor] = None) -> Dict[str, Any]:
+        """
+        Scan a directory into a plain node dict.
+        
+        The whole subtree is walked once so that file, directory and byte totals
+        can be folded into the node, but only entries within the display depth
+        are kept as children. Type and size come from the cached DirEntry data,
+        so each entry costs at most one lstat. This only touches the filesystem,
+        so it is safe to run off the main thread. When an executor is given,
+        each child directory is scanned as a separate task.
+        """
+        node = {'name': name, 'children': [], 'error': None, 'files': 0, 'dirs': 0, 'bytes': 0}
         try:
-            # Sort directories first, then files, both alphabetically
-            items = sorted(path.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower()))
-            for item in items:
-                build_tree(item, dir_node, current_depth + 1)
+            # Classify each entry once, dropping skipped names before sorting
+            entries = []
+            with os.scandir(path) as it:
+                for entry in it:
+                    if should_skip(entry.name):
+                        continue
+                    try:
+                        is_file = not entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    entries.append((is_file, entry.name.lower(), entry))
         except (PermissionError, OSError) as e:
-            dir_node.add(f"[red]Error reading: {e}[/]")
+            node['error'] = e
+            return node
+        
+        # Sort directories first, then files, both alphabetically
+        entries.sort(key=lambda item: item[:2])
+        
+        subdirs = []
+        for is_file, _, entry in entries:
+            if not is_file:
+                if executor is not None:
+                    subdirs.append(executor.submit(scan_dir, entry.path, entry.name, current_depth + 1))
+                else:
+                    subdirs.append(scan_dir(entry.path, entry.name, current_depth + 1))
+            else:
+                # A file may vanish or be unreadable mid-scan; skip just that entry
+                try:
+                    size = entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+                node['files'] += 1
+                node['bytes'] += size
+                if current_depth < depth:
+                    node['children'].append((entry.name, size))
+        
+        if executor is not None:
+            subdirs = [future.result() for future in subdirs]
+        for child in subdirs:
+            node['files'] += child['files']
+            node['dirs'] += child['dirs'] + 1
+            node['bytes'] += child['bytes']
+        
+        # Directories are listed before files
+        if current_depth + 1 < depth:
+            node['children'][:0] = subdirs
+        return node
+    
+    def build_tree(node: Dict[str, Any], tree: Tree):
+        """Attach a scanned node to the Rich tree (main thread only)"""
+        dir_node = tree.add(f"[bold]{node['name']}/[/]")
+        if node['error'] is not None:
+            dir_node.add(f"[red]Error reading: {node['error']}[/]")
+        for child in node['children']:
+            if isinstance(child, dict):
+                build_tree(child, dir_node)
+            else:
+                name, size = child
+                dir_node.add(f"{name} [dim]({format_size(size)})[/]")
     
     try:
         console.print(f"[bold blue]Repository Structure:[/] [dim]{repo_path}[/]\n")
         
         # Show repository info if it's a git repo
         if (repo_path / '.git').exists():
-            result = subprocess.run(
-                ['git', 'remote', '-v'],
-                cwd=repo_path,
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                remote = result.stdout.split('\n')[0].split('\t')[1].split(' ')[0]
+            remote = _remote_url(repo_path)
+            if remote != "Unknown":
                 console.print(f"[bold]Remote:[/] {remote}")
         
         # Build and display the tree
         tree = Tree(f"[bold]{repo_path.name}/[/]")
-        build_tree(repo_path, tree)
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+            root = scan_dir(str(repo_path), repo_path.name, executor=executor)
+        if not should_skip(repo_path.name) and depth > 0:
+            build_tree(root, tree)
         console.print(tree)
         
-        # Show summary
-        file_count = sum(1 for _ in repo_path.glob('**/*') if _.is_file() and not should_skip(_))
-        dir_count = sum(1 for _ in repo_path.glob('**/') if not should_skip(_)) - 1  # -1 to exclude self
-        total_size = get_size(repo_path)
-        
+        # Show summary, using the totals folded into the scan
         console.print("\n[bold]Summary:[/]")
-        console.print(f"• Files: {file_count:,}")
-        console.print(f"• Directories: {dir_count:,}")
-        console.print(f"• Total size: {total_size}")
+        console.print(f"• Files: {root['files']:,}")
+        console.print(f"• Directories: {root['dirs']:,}")
+        console.print(f"• Total size: {format_size(root['bytes'])}")
         
     except Exception as e:
         console.print(f"[red]Error: {str(e)}[/]")
@@ -320,11 +571,10 @@ def structure(ctx: click.Context, repo_path: str, depth: int, show_hidden: bool)
 @click.pass_context
 def explain(ctx: click.Context, file_path: str):
     """Explain a file's contents"""
-    from rich.console import Console
     from rich.markdown import Markdown
     from .llm_manager import LLMManager
     
-    console = Console()
+    console = _console()
     file_path = Path(file_path).resolve()
     
     with console.status(f"[bold green]Analyzing {file_path.name}...") as status:
@@ -342,7 +592,7 @@ def explain(ctx: click.Context, file_path: str):
 def memory(ctx: click.Context):
     """Manage conversation memory"""
     from .memory_manager import MemoryManager
-    ctx.obj['memory_manager'] = MemoryManager()
+    ctx.obj['memory_manager'] = ctx.with_resource(MemoryManager())
 
 @memory.command('search')
 @click.argument('query')
@@ -371,33 +621,40 @@ def clear_memory(ctx: click.Context):
     """Clear conversation memory"""
     if click.confirm('Are you sure you want to clear all conversation memory? This cannot be undone.', abort=False):
         memory_manager = ctx.obj['memory_manager']
-        # ChromaDB doesn't have a direct clear method, so we'll recreate the collection
-        memory_manager.client.delete_collection("conversation_memory")
-        memory_manager.collection = memory_manager.client.get_or_create_collection("conversation_memory")
-        click.echo("Successfully cleared conversation memory.")
+        if memory_manager.clear_memory():
+            click.echo("Successfully cleared conversation memory.")
+        else:
+            click.echo("Failed to clear conversation memory.", err=True)
 
 @cli.command()
 @click.argument('message')
 @click.pass_context
 def chat(ctx: click.Context, message: str):
     """Chat with the AI about the repository"""
-    from rich.console import Console
+    from rich.live import Live
     from rich.markdown import Markdown
     from .llm_manager import LLMManager
+    from .memory_manager import MemoryManager
     
-    console = Console()
-    
-    # Initialize memory manager and LLM
-    memory_manager = MemoryManager()
-    llm = LLMManager(memory_manager=memory_manager)
+    console = _console()
     
-    # Get response from LLM (memory is handled internally by LLMManager)
-    with console.status("[bold green]Thinking...") as status:
-        response = llm.chat(message)
+    # Initialize memory manager and LLM; the turn is saved when the block exits.
+    # When the turn triggers a rolling summary refresh, the process waits for
+    # that request to finish before exiting
+    with MemoryManager() as memory_manager:
+        llm = LLMManager(memory_manager=memory_manager)
+        
+        # Get response from LLM (memory is handled internally by LLMManager)
+        with console.status("[bold green]Thinking...") as status:
+            chunks = llm.chat_stream(message)
+            response = next(chunks, "")
         
-        # Print the response
+        # Print the response as it streams in
         console.print("\n[bold]AI:[/bold]")
-        console.print(Markdown(response))
+        with Live(Markdown(response), console=console, refresh_per_second=8) as live:
+            for chunk in chunks:
+                response += chunk
+                live.update(Markdown(response))
 
 def main():
     cli(obj={})
@@ -2,12 +2,47 @@
 GitHub repository interaction module
 """
 import os
+import subprocess
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 import requests
 from github import Github, GithubException
 from github.Repository import Repository
-import git
+
+# Everything get_repo_info needs, fetched in a single GraphQL request instead of
+# the REST repo call plus the lazy topics/subscribers/network requests
+_REPO_INFO_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    name
+    nameWithOwner
+    description
+    url
+    stargazerCount
+    forkCount
+    watchers { totalCount }
+    primaryLanguage { name }
+    licenseInfo { key }
+    createdAt
+    updatedAt
+    repositoryTopics(first: 20) { nodes { topic { name } } }
+    issues(states: OPEN) { totalCount }
+    pullRequests(states: OPEN) { totalCount }
+    defaultBranchRef { name }
+    hasIssuesEnabled
+    hasProjectsEnabled
+    hasWikiEnabled
+    isArchived
+    isDisabled
+    visibility
+    diskUsage
+  }
+}
+"""
+
+def _iso(timestamp: Optional[str]) -> Optional[str]:
+    """Normalize a GraphQL timestamp to the datetime.isoformat() form used by the REST path"""
+    return timestamp.replace('Z', '+00:00') if timestamp else timestamp
 
 class GitHubHandler:
     """Handle GitHub repository operations"""
@@ -15,18 +50,68 @@ class GitHubHandler:
     def __init__(self, github_token: Optional[str] = None):
         """Initialize GitHub handler with optional API token"""
         self.github = Github(github_token) if github_token else Github()
-        self.rate_limit = self.github.get_rate_limit()
     
     def get_repo_info(self, repo_url: str) -> Dict[str, Any]:
         """Get repository information from GitHub API"""
+        # Extract owner and repo name from URL
+        if 'github.com' in repo_url:
+            parts = repo_url.rstrip('/').split('/')
+            repo_name = f"{parts[-2]}/{parts[-1]}"
+        else:
+            repo_name = repo_url
+        
+        owner, _, name = repo_name.partition('/')
+        try:
+            _, response = self.github.requester.requestJsonAndCheck(
+                'POST',
+                '/graphql',
+                input={'query': _REPO_INFO_QUERY, 'variables': {'owner': owner, 'name': name}}
+            )
+            repo = (response.get('data') or {}).get('repository')
+            if repo is not None:
+                return self._repo_info_from_graphql(repo)
+        except GithubException as e:
+            # GraphQL requires authentication; fall back to REST on client errors
+            if not 400 <= e.status < 500:
+                return {
+                    'error': str(e),
+                    'message': 'Failed to fetch repository information'
+                }
+        
+        return self._get_repo_info_rest(repo_name)
+    
+    def _repo_info_from_graphql(self, repo: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a GraphQL repository node to the get_repo_info dict"""
+        return {
+            'name': repo['name'],
+            'full_name': repo['nameWithOwner'],
+            'description': repo['description'],
+            'url': repo['url'],
+            'stars': repo['stargazerCount'],
+            'forks': repo['forkCount'],
+            'watchers': repo['stargazerCount'],  # REST watchers_count mirrors stars
+            'language': (repo['primaryLanguage'] or {}).get('name'),
+            'license': (repo['licenseInfo'] or {}).get('key'),
+            'created_at': _iso(repo['createdAt']),
+            'updated_at': _iso(repo['updatedAt']),
+            'topics': [node['topic']['name'] for node in repo['repositoryTopics']['nodes']],
+            'open_issues': repo['issues']['totalCount'] + repo['pullRequests']['totalCount'],
+            'default_branch': (repo['defaultBranchRef'] or {}).get('name'),
+            'subscribers_count': repo['watchers']['totalCount'],
+            'network_count': repo['forkCount'],  # not exposed by GraphQL; closest equivalent
+            'has_issues': repo['hasIssuesEnabled'],
+            'has_projects': repo['hasProjectsEnabled'],
+            'has_wiki': repo['hasWikiEnabled'],
+            'has_downloads': None,  # not exposed by GraphQL
+            'archived': repo['isArchived'],
+            'disabled': repo['isDisabled'],
+            'visibility': repo['visibility'].lower(),
+            'size': repo['diskUsage'],  # in KB
+        }
+    
+    def _get_repo_info_rest(self, repo_name: str) -> Dict[str, Any]:
+        """Get repository information using the REST API"""
         try:
-            # Extract owner and repo name from URL
-            if 'github.com' in repo_url:
-                parts = repo_url.rstrip('/').split('/')
-                repo_name = f"{parts[-2]}/{parts[-1]}"
-            else:
-                repo_name = repo_url
-                
             repo = self.github.get_repo(repo_name)
             
             return {
@@ -62,14 +147,68 @@ class GitHubHandler:
                 'message': 'Failed to fetch repository information'
             }
     
-    def clone_repository(self, repo_url: str, target_dir: str) -> Dict[str, Any]:
-        """Clone a GitHub repository to the specified directory"""
+    def clone_repository(
+        self,
+        repo_url: str,
+        target_dir: str,
+        depth: Optional[int] = 1,
+        filter: Optional[str] = 'blob:none'
+    ) -> Dict[str, Any]:
+        """
+        Clone a GitHub repository to the specified directory
+        
+        Args:
+            repo_url: URL of the repository to clone
+            target_dir: Directory to clone into
+            depth: Number of commits to fetch, or None for the full history
+            filter: Partial clone filter spec (e.g. 'blob:none'), or None for no filter
+        """
+        # Ensure target directory exists
+        target_path = Path(target_dir).expanduser().resolve()
+        target_path.mkdir(parents=True, exist_ok=True)
+        
+        if depth is None and filter is None:
+            return self._clone_full(repo_url, target_path)
+        
         try:
-            # Ensure target directory exists
-            target_path = Path(target_dir).expanduser().resolve()
-            target_path.mkdir(parents=True, exist_ok=True)
+            # Clone the repository with the git binary directly
+            args = ['git', 'clone']
+            if depth is not None:
+                args += ['--depth', str(depth)]
+            if filter is not None:
+                args += ['--filter', filter]
+            args += [repo_url, str(target_path)]
+            subprocess.run(args, check=True, capture_output=True, text=True)
+            
+            commit = subprocess.run(
+                ['git', '-C', str(target_path), 'rev-parse', 'HEAD'],
+                capture_output=True, text=True
+            ).stdout.strip()
+            branch = subprocess.run(
+                ['git', '-C', str(target_path), 'symbolic-ref', '--short', 'HEAD'],
+                capture_output=True, text=True
+            ).stdout.strip()
+            
+            return {
+                'success': True,
+                'path': str(target_path),
+                'branch': branch,
+                'commit': commit,
+                'message': 'Repository cloned successfully'
+            }
             
-            # Clone the repository
+        except subprocess.CalledProcessError as e:
+            return {
+                'success': False,
+                'error': e.stderr or str(e),
+                'message': 'Failed to clone repository'
+            }
+    
+    def _clone_full(self, repo_url: str, target_path: Path) -> Dict[str, Any]:
+        """Clone the full repository history using GitPython"""
+        import git
+        
+        try:
             repo = git.Repo.clone_from(repo_url, target_path)
             
             return {
@@ -98,28 +237,68 @@ class GitHubHandler:
                     'message': 'The specified path is not a git repository'
                 }
             
-            def get_tree(path: Path, level: int = 0) -> List[Dict]:
-                """Recursively build directory tree"""
-                result = []
-                for item in path.iterdir():
-                    if item.name.startswith('.'):
-                        continue
-                        
-                    item_info = {
-                        'name': item.name,
-                        'type': 'directory' if item.is_dir() else 'file',
-                        'path': str(item.relative_to(repo_path)),
-                        'size': item.stat().st_size if item.is_file() else 0,
-                        'children': get_tree(item, level + 1) if item.is_dir() else []
+            # List the whole tree with blob sizes in one git call instead of
+            # walking and stat()ing the working tree
+            result = subprocess.run(
+                ['git', '-C', str(repo_path), 'ls-tree', '-r', '-l', '-z', '--full-tree', 'HEAD'],
+                capture_output=True,
+                text=True
+            )
+            if result.returncode != 0:
+                return {
+                    'success': False,
+                    'error': result.stderr.strip(),
+                    'message': 'Failed to analyze repository structure'
+                }
+            
+            structure: List[Dict] = []
+            directories: Dict[str, Dict] = {}
+            
+            def get_directory(path: str) -> Dict:
+                """Get or create the node for a directory path"""
+                node = directories.get(path)
+                if node is None:
+                    parent, _, name = path.rpartition('/')
+                    node = {
+                        'name': name,
+                        'type': 'directory',
+                        'path': path,
+                        'size': 0,
+                        'children': []
                     }
-                    result.append(item_info)
-                return result
+                    directories[path] = node
+                    (get_directory(parent)['children'] if parent else structure).append(node)
+                return node
+            
+            for line in result.stdout.split('\0'):
+                if not line:
+                    continue
+                # Each entry is "<mode> <type> <sha> <size>\t<path>"
+                info, _, path = line.partition('\t')
+                _, obj_type, _, size = info.split()
+                parts = path.split('/')
+                if any(part.startswith('.') for part in parts):
+                    continue
+                
+                if obj_type != 'blob':
+                    # Submodules show up as commits
+                    get_directory(path)
+                    continue
+                
+                parent = path.rpartition('/')[0]
+                (get_directory(parent)['children'] if parent else structure).append({
+                    'name': parts[-1],
+                    'type': 'file',
+                    'path': path,
+                    'size': int(size),
+                    'children': []
+                })
             
             return {
                 'success': True,
                 'name': repo_path.name,
                 'path': str(repo_path),
-                'structure': get_tree(repo_path)
+                'structure': structure
             }
             
         except Exception as e:
@@ -130,9 +309,10 @@ class GitHubHandler:
             }
     
     def get_rate_limit(self) -> Dict[str, Any]:
-        """Get GitHub API rate limit information"""
+        """Get GitHub API rate limit information (fetched on each call)"""
+        core = self.github.get_rate_limit().core
         return {
-            'limit': self.rate_limit.core.limit,
-            'remaining': self.rate_limit.core.remaining,
-            'reset': self.rate_limit.core.reset.isoformat()
+            'limit': core.limit,
+            'remaining': core.remaining,
+            'reset': core.reset.isoformat()
         }
@@ -2,20 +2,175 @@
 LLM Manager for handling Groq-hosted model interactions
 """
 from pathlib import Path
+from collections import OrderedDict
+import functools
 import mimetypes
 import logging
 import os
+import stat
 import json
+import hashlib
+import sqlite3
+import threading
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Iterator, List, Optional, Any
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 load_dotenv()
 
+__all__ = ["LLMManager"]
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+# httpx logs every request at INFO
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# Request bodies are serialized with orjson when it is installed; its
+# JSONDecodeError subclasses json.JSONDecodeError, so error handling is shared
+if orjson is not None:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+    _loads = json.loads
+
+# Replies returned in place of a completion when the request fails
+_CONNECTION_ERROR = "I'm having trouble connecting to the AI service. Please try again in a moment."
+_RESPONSE_ERROR = "I received an unexpected response from the AI service. Please try again."
+_UNEXPECTED_ERROR = "I encountered an unexpected error while generating a response. Please try again later."
+
+# System message that opens every chat completion
+_SYSTEM_CHAT = (
+    "You are a helpful AI assistant for a code repository. "
+    "You are having a conversation with the user. Below is the conversation history, "
+    "followed by the user's latest message. Please respond appropriately, "
+    "maintaining context from the entire conversation. "
+    "If the user refers to previous messages or context, be sure to acknowledge and address those references.\n\n"
+)
+
+# A rolling summary is refreshed once this many turns are not covered by it,
+# folding in the oldest of them first, and at least the last _RECENT_TURNS turns
+# are always sent verbatim. Turns not covered yet are all sent verbatim too, up
+# to _MAX_PROMPT_TURNS, so a backlog left by failed refreshes stays in the prompt
+_SUMMARY_INTERVAL = 5
+_RECENT_TURNS = 2
+_MAX_PROMPT_TURNS = 4 * _SUMMARY_INTERVAL
+
+_SUMMARY_TEMPLATE = """Update the summary of a conversation between a user and an AI assistant about a code repository.
+
+Current summary:
+{summary}
+
+New turns:
+{conversation}
+
+Reply with only the updated summary, in a few sentences. Keep names, files and decisions the user may refer back to.
+"""
+
+# Prompt for explain_file; filled with str.format so braces in the file content are left alone
+_EXPLAIN_TEMPLATE = """I need you to explain the following file: {name}
+File type: {ftype} ({ext})
+
+The file content is:
+{content}
+
+Please provide a detailed explanation of what this file does, including:
+1. The purpose of the file
+2. Key functions/classes and their roles
+3. Important variables and their purposes
+4. Any notable patterns or design decisions
+5. Dependencies or requirements
+
+Format your response in clear, well-structured markdown.
+"""
+
+# Short acknowledgements that are not stored in conversation memory
+_TRIVIAL_MESSAGES = frozenset({
+    "hi", "hello", "hey", "thanks", "thank you", "thx", "ok", "okay", "yes", "no", "bye"
+})
+
+def _is_trivial(message: str) -> bool:
+    """Whether a chat message is a bare greeting or acknowledgement"""
+    return len(message) < 16 and message.strip().strip("!.?").lower() in _TRIVIAL_MESSAGES
+
+@functools.lru_cache(maxsize=256)
+def _guess_type(ext: str) -> str:
+    """Guess a MIME type from a lowercased file extension, once per extension"""
+    return mimetypes.guess_type("file" + ext)[0] or "unknown"
+
+class _ResponseCache:
+    """
+    Exact-match cache of completions keyed by a hash of the request payload.
+    
+    An in-process LRU sits in front of a small SQLite table so repeated
+    prompts are answered without an API round-trip, across runs as well.
+    """
+    
+    def __init__(self, path: Optional[Path] = None, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._lru: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(str(path), check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, content TEXT NOT NULL)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Response cache at {path} unavailable, using in-memory cache only: {e}")
+                self._db = None
+    
+    @staticmethod
+    def key(data: Dict[str, Any]) -> str:
+        """Hash a request payload into a cache key"""
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached content for a key, or None"""
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                return self._lru[key]
+            if self._db is None:
+                return None
+            row = self._db.execute("SELECT content FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._remember(key, row[0])
+            return row[0]
+    
+    def set(self, key: str, content: str) -> None:
+        """Store content under a key"""
+        with self._lock:
+            self._remember(key, content)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO responses (key, content) VALUES (?, ?)", (key, content)
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to persist cached response: {e}")
+    
+    def _remember(self, key: str, content: str) -> None:
+        self._lru[key] = content
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
 
 class LLMManager:
     """Manager for Groq-hosted LLM operations via API"""
@@ -36,12 +191,41 @@ class LLMManager:
 
         self.api_url = "https://api.groq.com/openai/v1/chat/completions"
         
+        # Reuse one pooled connection for all API calls
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=10,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=frozenset({"POST"}),
+                raise_on_status=False
+            )
+        )
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        })
+        
         # Use provided memory manager or create a new one
         if memory_manager is None:
             from .memory_manager import MemoryManager
             self.memory = MemoryManager()
         else:
             self.memory = memory_manager
+        
+        # Cache identical requests next to the conversation memory
+        persist_directory = getattr(self.memory, 'persist_directory', None)
+        self.response_cache = _ResponseCache(
+            Path(persist_directory) / "response_cache.sqlite3" if persist_directory else None
+        )
+        
+        # Rolling conversation summaries are generated off the chat path
+        self._summary_executor = ThreadPoolExecutor(max_workers=1)
+        self._summary_future = None
     
     def explain_file(self, file_path: Path) -> str:
         """
@@ -53,12 +237,89 @@ class LLMManager:
                 return "Unable to read or empty file."
             
             prompt = self._create_explanation_prompt(file_path, content)
-            explanation = self.generate_text(prompt, max_length=1000)
+            explanation = self.generate_text_raw(prompt, max_length=1000)
+            return explanation.strip()
+        except Exception as e:
+            logger.error(f"Error explaining file {file_path}: {e}")
+            return f"Error generating explanation: {str(e)}"
+
+    async def explain_files(self, paths: List[Path], max_concurrency: int = 10) -> List[str]:
+        """
+        Explain several files concurrently using Groq-hosted LLM.
+        
+        Requests are multiplexed over one HTTP/2 connection, with at most
+        `max_concurrency` in flight to stay within Groq rate limits.
+        
+        Args:
+            paths: Files to explain
+            max_concurrency: Maximum number of simultaneous API requests
+            
+        Returns:
+            List[str]: Explanations, in the same order as `paths`
+        """
+        import httpx
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        async with httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=32),
+            headers=dict(self.session.headers),
+            timeout=60
+        ) as client:
+            return await asyncio.gather(
+                *(self._explain_one(client, semaphore, Path(path)) for path in paths)
+            )
+
+    async def _explain_one(self, client, semaphore: asyncio.Semaphore, file_path: Path) -> str:
+        """Explain a single file for explain_files"""
+        try:
+            content = self._read_file(file_path)
+            if not content:
+                return "Unable to read or empty file."
+            
+            prompt = self._create_explanation_prompt(file_path, content)
+            async with semaphore:
+                explanation = await self._chat_completion_async(
+                    client,
+                    self._one_shot_messages(prompt),
+                    max_tokens=1000
+                )
             return explanation.strip()
         except Exception as e:
             logger.error(f"Error explaining file {file_path}: {e}")
             return f"Error generating explanation: {str(e)}"
 
+    async def _chat_completion_async(
+        self,
+        client,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7
+    ) -> str:
+        """
+        Generate a completion on an httpx.AsyncClient
+        
+        Sends the same payload as generate_text_raw, so both share cached responses.
+        Errors are raised to the caller.
+        """
+        data = {
+            "model": self.model_name,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature
+        }
+        
+        cache_key = self.response_cache.key(data)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        response = await client.post(self.api_url, content=_dumps(data))
+        response.raise_for_status()
+        content = _loads(response.content)["choices"][0]["message"]["content"]
+        self.response_cache.set(cache_key, content)
+        return content
+
     def chat(self, message: str, context: Optional[Dict[str, Any]] = None) -> str:
         """
         Chat with the AI about the repository with conversation memory
@@ -70,146 +331,225 @@ class LLMManager:
         Returns:
             str: AI's response
         """
-        try:
-            # Get recent conversation history
-            conversation_history = self.memory.get_conversation_history(limit=5)
-            
-            # Prepare the system message with clear instructions about context
-            system_message = (
-                "You are a helpful AI assistant for a code repository. "
-                "You are having a conversation with the user. Below is the conversation history, "
-                "followed by the user's latest message. Please respond appropriately, "
-                "maintaining context from the entire conversation. "
-                "If the user refers to previous messages or context, be sure to acknowledge and address those references.\n\n"
-            )
-            
-            # Prepare messages list for the chat completion
-            messages = [{"role": "system", "content": system_message}]
-            
-            # Add conversation history if available
-            if conversation_history:
-                # Add a summary of the conversation so far
-                conversation_summary = "\n".join(
-                    f"User: {conv['query']}\nAssistant: {conv['response']}"
-                    for conv in conversation_history
-                )
-                messages.append({
-                    "role": "system",
-                    "content": f"Conversation history so far:\n{conversation_summary}"
-                })
+        return "".join(self.chat_stream(message, context)).strip()
+
+    def chat_stream(self, message: str, context: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        Chat with the AI about the repository, yielding the response as it is generated
+        
+        The conversation is stored in memory once the response has been fully consumed,
+        unless it was answered from the semantic cache or is a bare greeting or thanks.
+        Memory writes are batched and flushed within a second; call ``self.memory.save()``
+        to make a turn durable immediately. Every fifth stored turn also refreshes the
+        rolling summary on a background thread, which the interpreter waits for at exit.
+        
+        Args:
+            message: User's message
+            context: Optional context to include in the prompt
             
-            # Add current message with any context
-            user_message = message
-            if context:
-                context_str = "\nContext: " + json.dumps(context, indent=2)
-                user_message += context_str
+        Yields:
+            str: Chunks of the AI's response
+        """
+        try:
+            # Reuse the answer to a near-identical earlier question; extra
+            # context can change the answer, so only bare messages are looked up
+            response = None if context else self.memory.lookup_semantic(message)
+            cache_hit = response is not None
             
-            messages.append({"role": "user", "content": user_message})
+            if cache_hit:
+                yield response
+            else:
+                # Stream the response using the chat completion API
+                conversation_history = self.memory.get_conversation_history(limit=_MAX_PROMPT_TURNS)
+                messages = self._build_chat_messages(message, context, conversation_history)
+                chunks = []
+                for chunk in self._chat_completion_stream(messages, max_tokens=1500):
+                    chunks.append(chunk)
+                    yield chunk
+                response = "".join(chunks).strip()
+                if response and not context:
+                    self.memory.cache_response(message, response)
             
-            # Generate response using the chat completion API
-            response = self._chat_completion(messages, max_tokens=1500).strip()
+            # Repeated and trivial turns add nothing worth recalling later
+            if cache_hit or _is_trivial(message):
+                logger.debug("Not storing %s turn in memory", "cached" if cache_hit else "trivial")
+                return
             
             # Store the conversation in memory
-            self.memory.add_conversation(
-                query=message,
-                response=response,
-                metadata={
-                    'model': self.model_name,
-                    'context': context or {},
-                    'timestamp': int(datetime.now().timestamp())
-                }
-            )
+            metadata = {
+                'model': self.model_name,
+                'context': context or {}
+            }
+            self.memory.add_conversation(query=message, response=response, metadata=metadata)
+            # add_conversation fills in 'ts'; counting from the history fetched
+            # above avoids reading (and flushing) memory again on every turn
+            turn = {'query': message, 'response': response, 'ts': metadata['ts']}
+            self._maybe_refresh_summary([turn] + conversation_history)
             
-            # Ensure the memory is persisted
-            self.memory.save()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Request error in chat completion: {str(e)}")
+            yield _CONNECTION_ERROR
             
-            return response
+        except (KeyError, IndexError, json.JSONDecodeError) as e:
+            logger.error(f"Error parsing response from Groq API: {str(e)}")
+            yield _RESPONSE_ERROR
             
         except Exception as e:
             logger.error(f"Error in chat: {e}")
-            return f"I encountered an error while processing your request: {str(e)}"
+            yield f"I encountered an error while processing your request: {str(e)}"
+
+    def _build_chat_messages(
+        self,
+        message: str,
+        context: Optional[Dict[str, Any]] = None,
+        conversation_history: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, str]]:
+        """Build the chat completion messages from recent history and the user's message"""
+        # Get recent conversation history
+        if conversation_history is None:
+            conversation_history = self.memory.get_conversation_history(limit=_MAX_PROMPT_TURNS)
+        
+        # Prepare messages list for the chat completion
+        messages = [{"role": "system", "content": _SYSTEM_CHAT}]
+        
+        # Older turns are represented by the rolling summary; only the turns it
+        # does not cover yet, and at least the last few, are sent verbatim
+        summary = self.memory.get_summary()
+        if summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{summary['summary']}"
+            })
+            recent = [conv for conv in conversation_history if conv['ts'] > summary['ts']]
+            if len(recent) < _RECENT_TURNS:
+                recent = conversation_history[:_RECENT_TURNS]
+            conversation_history = recent
+        
+        # Add conversation history if available
+        if conversation_history:
+            # Add a summary of the conversation so far
+            conversation_summary = "\n".join(
+                f"User: {conv['query']}\nAssistant: {conv['response']}"
+                for conv in conversation_history
+            )
+            messages.append({
+                "role": "system",
+                "content": f"Conversation history so far:\n{conversation_summary}"
+            })
+        
+        # Add current message with any context
+        user_message = message
+        if context:
+            context_str = "\nContext: " + json.dumps(context, indent=2)
+            user_message += context_str
+        
+        messages.append({"role": "user", "content": user_message})
+        return messages
+
+    def _maybe_refresh_summary(self, recent_turns: List[Dict[str, Any]]) -> None:
+        """Summarize in the background once enough turns are not covered by the rolling summary
+        
+        Args:
+            recent_turns: The newest turns, newest first, including the one just stored
+        """
+        if self._summary_future is not None and not self._summary_future.done():
+            return
+        summary = self.memory.get_summary()
+        covered = summary['ts'] if summary else 0
+        uncovered = sum(1 for conv in recent_turns if conv['ts'] > covered)
+        if uncovered >= _SUMMARY_INTERVAL:
+            self._summary_future = self._summary_executor.submit(self._refresh_summary)
+
+    def _refresh_summary(self) -> None:
+        """
+        Fold the oldest turns not covered yet into the rolling summary
+        
+        Fetches every uncovered turn, since earlier refreshes may have failed or
+        been skipped, and records the newest turn actually folded in as covered.
+        """
+        try:
+            summary = self.memory.get_summary()
+            uncovered = self.memory.get_conversation_history(
+                limit=None,
+                since=summary['ts'] if summary else None
+            )
+            # History is newest first; take the oldest turns, in order
+            turns = uncovered[::-1][:_SUMMARY_INTERVAL]
+            if not turns:
+                return
+            conversation = "\n".join(
+                f"User: {conv['query']}\nAssistant: {conv['response']}"
+                for conv in turns
+            )
+            prompt = _SUMMARY_TEMPLATE.format(
+                summary=summary['summary'] if summary else "(none)",
+                conversation=conversation
+            )
+            text = self._chat_completion(self._one_shot_messages(prompt), max_tokens=300)
+            if text in (_CONNECTION_ERROR, _RESPONSE_ERROR, _UNEXPECTED_ERROR):
+                logger.warning("Could not refresh the conversation summary")
+                return
+            self.memory.update_summary(text, turns[-1]['ts'])
+        except Exception as e:
+            logger.error(f"Error refreshing conversation summary: {e}")
 
     def _read_file(self, file_path: Path):
         """Read and return the content of a file with basic validation."""
-        if not file_path.exists() or not file_path.is_file():
+        try:
+            # One stat covers the existence, type and size checks
+            st = file_path.stat()
+        except OSError:
             return None
-        if file_path.stat().st_size > 1_000_000:  # limit 1MB
+        if not stat.S_ISREG(st.st_mode) or st.st_size > 1_000_000:  # limit 1MB
             return None
         try:
-            return file_path.read_text(encoding="utf-8", errors="ignore")
+            with file_path.open("rb") as f:
+                raw = f.read(st.st_size)
         except Exception as e:
             logger.error(f"Error reading file {file_path}: {e}")
             return None
+        # Binary files decode to noise; skip them like unreadable ones
+        if b"\x00" in raw[:4096]:
+            return None
+        return raw.decode("utf-8", errors="ignore")
 
     def _create_explanation_prompt(self, file_path: Path, content: str) -> str:
         """Create a prompt for explaining the file content."""
-        file_type = mimetypes.guess_type(file_path)[0] or "unknown"
         file_ext = file_path.suffix.lower()
         
-        return f"""I need you to explain the following file: {file_path.name}
-File type: {file_type} ({file_ext})
-
-The file content is:
-{content}
+        return _EXPLAIN_TEMPLATE.format(
+            name=file_path.name,
+            ftype=_guess_type(file_ext),
+            ext=file_ext,
+            content=content
+        )
 
-Please provide a detailed explanation of what this file does, including:
-1. The purpose of the file
-2. Key functions/classes and their roles
-3. Important variables and their purposes
-4. Any notable patterns or design decisions
-5. Dependencies or requirements
-
-Format your response in clear, well-structured markdown.
-"""
-
-    def generate_text(self, prompt: str, max_length: int = 1000, temperature: float = 0.7) -> str:
+    def generate_text(self, prompt: str, max_length: int = 1000, temperature: float = 0.7, bypass_cache: bool = False) -> str:
         """
         Generate text using the Groq-hosted LLM
         
+        Kept for compatibility; equivalent to generate_text_raw. Callers with a
+        structured conversation should pass their messages to _chat_completion
+        instead of flattening them into a prompt.
+        """
+        return self.generate_text_raw(prompt, max_length, temperature, bypass_cache)
+
+    def generate_text_raw(self, prompt: str, max_length: int = 1000, temperature: float = 0.7, bypass_cache: bool = False) -> str:
+        """
+        Generate text for a single one-shot prompt using the Groq-hosted LLM
+        
+        The prompt is sent as one user message, as is.
+        
         Args:
             prompt: The prompt to generate text from
             max_length: Maximum length of the generated text
             temperature: Controls randomness (0.0 to 1.0)
+            bypass_cache: Always query the API instead of reusing a cached response
             
         Returns:
             str: Generated text
         """
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        # Split prompt into system message and user message if it contains "Assistant:"
-        messages = [{"role": "system", "content": "You are a helpful AI assistant."}]
-        
-        # Check if prompt contains conversation history
-        if "\nUser:" in prompt or "\nAssistant:" in prompt:
-            # Parse conversation history from prompt
-            lines = prompt.split('\n')
-            current_role = None
-            current_content = []
-            
-            for line in lines:
-                line = line.strip()
-                if line.startswith('User:'):
-                    if current_role and current_content:
-                        messages.append({"role": current_role, "content": '\n'.join(current_content)})
-                    current_role = "user"
-                    current_content = [line[5:].strip()]  # Remove "User:" prefix
-                elif line.startswith('Assistant:'):
-                    if current_role and current_content:
-                        messages.append({"role": current_role, "content": '\n'.join(current_content)})
-                    current_role = "assistant"
-                    current_content = [line[10:].strip()]  # Remove "Assistant:" prefix
-                elif current_content is not None:
-                    current_content.append(line)
-            
-            # Add the last message
-            if current_role and current_content:
-                messages.append({"role": current_role, "content": '\n'.join(current_content)})
-        else:
-            # Single user message
-            messages.append({"role": "user", "content": prompt})
+        messages = self._one_shot_messages(prompt)
         
         data = {
             "model": self.model_name,
@@ -218,71 +558,147 @@ Format your response in clear, well-structured markdown.
             "temperature": temperature
         }
         
+        cache_key = self.response_cache.key(data)
+        if not bypass_cache:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.api_url,
-                headers=headers,
-                json=data,
+                data=_dumps(data),
                 timeout=60
             )
             response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
+            content = _loads(response.content)["choices"][0]["message"]["content"]
+            self.response_cache.set(cache_key, content)
+            return content
         except Exception as e:
             logger.error(f"Error generating text: {e}")
             return f"Error: {str(e)}"
 
-    def _chat_completion(self, messages: List[Dict[str, str]], max_tokens: int = 1000) -> str:
+    def _chat_completion(self, messages: List[Dict[str, str]], max_tokens: int = 1000, bypass_cache: bool = False) -> str:
         """
         Generate chat completion using the Groq API
         
         Args:
             messages: List of message dictionaries with 'role' and 'content'
             max_tokens: Maximum number of tokens in the response
+            bypass_cache: Always query the API instead of reusing a cached response
             
         Returns:
             str: Generated response
         """
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        data = self._chat_payload(messages, max_tokens)
         
-        # Prepare the data with improved parameters
-        data = {
-            "model": self.model_name,
-            "messages": messages,
-            "max_tokens": max_tokens,
-            "temperature": 0.7,
-            "top_p": 0.9,
-            "frequency_penalty": 0.2,
-            "presence_penalty": 0.2,
-            "stop": None
-        }
+        cache_key = self.response_cache.key(data)
+        if not bypass_cache:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
         
         try:
-            logger.debug(f"Sending request to Groq API with data: {json.dumps(data, indent=2)}")
-            response = requests.post(
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Sending request to Groq API with data: %s", json.dumps(data, indent=2))
+            response = self.session.post(
                 self.api_url,
-                headers=headers,
-                json=data,
+                data=_dumps(data),
                 timeout=60
             )
             response.raise_for_status()
-            response_json = response.json()
+            response_json = _loads(response.content)
             
             # Log the response for debugging
-            logger.debug(f"Received response from Groq API: {json.dumps(response_json, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Received response from Groq API: %s", json.dumps(response_json, indent=2))
             
-            return response_json["choices"][0]["message"]["content"].strip()
+            content = response_json["choices"][0]["message"]["content"].strip()
+            self.response_cache.set(cache_key, content)
+            return content
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Request error in chat completion: {str(e)}")
-            return "I'm having trouble connecting to the AI service. Please try again in a moment."
+            return _CONNECTION_ERROR
             
         except (KeyError, IndexError, json.JSONDecodeError) as e:
             logger.error(f"Error parsing response from Groq API: {str(e)}")
-            return "I received an unexpected response from the AI service. Please try again."
+            return _RESPONSE_ERROR
             
         except Exception as e:
             logger.error(f"Unexpected error in chat completion: {str(e)}")
-            return "I encountered an unexpected error while generating a response. Please try again later."
+            return _UNEXPECTED_ERROR
+
+    def _chat_completion_stream(self, messages: List[Dict[str, str]], max_tokens: int = 1000, bypass_cache: bool = False) -> Iterator[str]:
+        """
+        Stream a chat completion from the Groq API
+        
+        Shares the response cache with _chat_completion. Unlike it, request and
+        parsing errors are raised to the caller, including a stream that ends
+        before "[DONE]"; only complete, non-empty responses are cached.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            max_tokens: Maximum number of tokens in the response
+            bypass_cache: Always query the API instead of reusing a cached response
+            
+        Yields:
+            str: Content deltas as they arrive
+        """
+        data = self._chat_payload(messages, max_tokens)
+        
+        cache_key = self.response_cache.key(data)
+        if not bypass_cache:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        chunks = []
+        with self.session.post(
+            self.api_url,
+            data=_dumps({**data, "stream": True}),
+            timeout=60,
+            stream=True
+        ) as response:
+            response.raise_for_status()
+            # Server-sent events: "data: {...}" lines, terminated by "data: [DONE]"
+            done = False
+            for line in response.iter_lines():
+                if not line.startswith(b"data: "):
+                    continue
+                payload = line[6:]
+                if payload == b"[DONE]":
+                    done = True
+                    break
+                delta = _loads(payload)["choices"][0]["delta"].get("content") or ""
+                if delta:
+                    chunks.append(delta)
+                    yield delta
+        
+        if not done:
+            raise requests.exceptions.ChunkedEncodingError("Response stream ended before [DONE]")
+        text = "".join(chunks).strip()
+        if text:
+            self.response_cache.set(cache_key, text)
+
+    def _one_shot_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """Wrap a plain prompt as chat completion messages"""
+        return [
+            {"role": "system", "content": "You are a helpful AI assistant."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _chat_payload(self, messages: List[Dict[str, str]], max_tokens: int) -> Dict[str, Any]:
+        """Build the chat completion request body"""
+        # Prepare the data with improved parameters
+        return {
+            "model": self.model_name,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": 0.7,
+            "top_p": 0.9,
+            "frequency_penalty": 0.2,
+            "presence_penalty": 0.2,
+            "stop": None
+        }
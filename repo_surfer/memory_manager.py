@@ -1,19 +1,190 @@
 """Memory management for conversation history and vector storage."""
 from typing import Dict, List, Optional, Any, Union
 from pathlib import Path
-import chromadb
-from chromadb.config import Settings
-import json
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, wait
+import atexit
+import base64
+import collections
+import functools
 import hashlib
+import heapq
+import json
+import threading
+import time
+import chromadb
+import chromadb.errors
+import chromadb.utils.embedding_functions as embedding_functions
 import numpy as np
-from datetime import datetime
-import uuid
+
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Buffered conversations are written to the collection once this many are
+# pending, or at the latest this many seconds after the first one was added
+_BATCH_SIZE = 100
+_FLUSH_INTERVAL = 1.0
+
+# JSON lines for the fallback file are encoded with orjson when it is installed
+if orjson is not None:
+    _dumps = orjson.dumps
+else:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+# Dimension of the hash-based fallback embeddings, matching all-MiniLM-L6-v2
+_EMBEDDING_DIM = 384
+
+# Vectors are L2-normalized, so collections use the cheaper inner-product space.
+# The space cannot change in place, hence the versioned names; conversations in
+# the older cosine collection are copied over when the new one is created
+_COLLECTION = "conversation_memory_v2"
+_LEGACY_COLLECTION = "conversation_memory"
+_RESPONSE_CACHE_COLLECTION = "response_cache_v2"
+_COLLECTION_METADATA = {"hnsw:space": "ip"}
+
+# Ways of assigning conversation IDs, see MemoryManager.__init__
+_ID_MODES = ("deterministic", "random")
+# Number of random IDs generated at once
+_ID_BATCH = 1024
+
+# Raised by delete_collection for a missing collection (ValueError before Chroma 0.6)
+_MISSING_COLLECTION_ERRORS = (ValueError, getattr(chromadb.errors, "NotFoundError", ValueError))
+
+# Number of recently embedded texts whose vectors are kept for reuse
+_RECENT_EMBEDDINGS = 64
+
+# Initial time window for fetching recent history (one day, in milliseconds)
+_HISTORY_WINDOW_MS = 24 * 60 * 60 * 1000
+
+# Marks the rolling summary as not yet read from disk
+_UNLOADED = object()
+
+def _digest(data: bytes, length: int = 32) -> bytes:
+    """
+    Hash data to `length` bytes with BLAKE3, falling back to SHA-256
+    (SHAKE-256 for other lengths) when the blake3 package is not installed.
+    """
+    if blake3 is not None:
+        return blake3(data).digest(length=length)
+    if length == 32:
+        return hashlib.sha256(data).digest()
+    return hashlib.shake_256(data).digest(length)
+
+def _ts_from_timestamp(timestamp: Any) -> int:
+    """
+    Epoch milliseconds for a stored 'timestamp', or 0 when it cannot be parsed.
+    
+    ISO strings without an offset were written from utcnow() and are read as UTC;
+    numeric values are taken as epoch seconds.
+    """
+    try:
+        return int(float(timestamp) * 1000)
+    except (TypeError, ValueError):
+        pass
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return 0
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+@functools.lru_cache(maxsize=4096)
+def _embedding_digest(text: str) -> bytes:
+    """Hash-embedding bytes for a text, cached since queries and responses recur"""
+    return _digest(text.encode(), _EMBEDDING_DIM * 4)
+
+class SimpleEmbeddingFunction(embedding_functions.DefaultEmbeddingFunction):
+    """
+    Deterministic hash-based embeddings, used when no embedding model can be loaded.
+    
+    The vectors carry no semantic meaning (not for production use).
+    """
+    
+    def __init__(self):
+        super().__init__()
+        
+    def __call__(self, input):
+        # Handle both string and list of strings input
+        if isinstance(input, str):
+            input = [input]
+        
+        # Create simple hash-based embeddings (not for production use): an
+        # extendable-output digest of each text is read directly as 384 uint32
+        # values and scaled to [-1, 1] in one vectorized step
+        digests = b"".join(_embedding_digest(text) for text in input)
+        vectors = np.frombuffer(digests, dtype=np.uint32).reshape(len(input), _EMBEDDING_DIM)
+        vectors = vectors.astype(np.float32) * np.float32(2.0 / 0xFFFFFFFF) - np.float32(1.0)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        # Older chromadb releases only accept embeddings as lists of floats
+        return vectors.tolist()
+        
+    def name(self):
+        return "simple_embedding"
+
+def _load_embedding_function():
+    """
+    Get the embedding function for conversation memory.
+    
+    Prefers Chroma's bundled ONNX all-MiniLM-L6-v2, then the sentence-transformers
+    all-MiniLM-L6-v2 model, and falls back to hash-based vectors when neither can
+    be loaded (e.g. when offline). Each model is probed once so an unusable one
+    is rejected here rather than failing on the first query. All of them produce
+    unit-length vectors, as the inner-product collections require.
+    """
+    candidates = (
+        lambda: embedding_functions.ONNXMiniLM_L6_V2(),
+        lambda: embedding_functions.SentenceTransformerEmbeddingFunction(
+            model_name="all-MiniLM-L6-v2",
+            device="cpu",
+            normalize_embeddings=True
+        ),
+    )
+    error = None
+    for create in candidates:
+        try:
+            function = create()
+            function(["probe"])
+            return function
+        except Exception as e:
+            error = e
+    
+    print(f"No embedding model available ({error}), falling back to hash-based embeddings")
+    return SimpleEmbeddingFunction()
 
 class MemoryManager:
     """Manages conversation memory using ChromaDB"""
     
-    def __init__(self, persist_directory: str = "./chroma_db"):
-        """Initialize the memory manager with ChromaDB"""
+    def __init__(
+        self,
+        persist_directory: str = "./chroma_db",
+        batch_size: int = _BATCH_SIZE,
+        id_mode: str = "deterministic"
+    ):
+        """
+        Initialize the memory manager with ChromaDB
+        
+        Args:
+            persist_directory: Directory for the Chroma database and related files
+            batch_size: Number of buffered conversations written in one upsert
+            id_mode: "deterministic" derives conversation IDs from their content, so a
+                repeated query and response overwrites the earlier copy; "random" skips
+                hashing and never dedupes
+        """
+        if id_mode not in _ID_MODES:
+            raise ValueError(f"id_mode must be one of {', '.join(_ID_MODES)}, got {id_mode!r}")
+        self._id_mode = id_mode
+        # Randomness for "random" IDs, seeded from the OS once and drawn in blocks
+        self._rng = np.random.default_rng()
+        self._random_ids: List[str] = []
         self.persist_directory = Path(persist_directory)
         self.persist_directory.mkdir(parents=True, exist_ok=True)
         
@@ -22,78 +193,155 @@ class MemoryManager:
             path=str(self.persist_directory)
         )
         
-        # Define our simple embedding function
-        import chromadb.utils.embedding_functions as embedding_functions
-        
-        class SimpleEmbeddingFunction(embedding_functions.DefaultEmbeddingFunction):
-            def __init__(self):
-                super().__init__()
-                
-            def __call__(self, input):
-                # Handle both string and list of strings input
-                if isinstance(input, str):
-                    input = [input]
-                
-                # Create simple hash-based embeddings (not for production use)
-                import hashlib
-                
-                # Generate deterministic 384-dim vectors for each input
-                vectors = []
-                for text in input:
-                    hash_int = int(hashlib.sha256(text.encode()).hexdigest()[:16], 16)
-                    vector = []
-                    for _ in range(384):
-                        hash_int, val = divmod(hash_int, 2**32)
-                        vector.append((val % 2000 - 1000) / 1000.0)  # Values between -1 and 1
-                    vectors.append(vector)
-                return vectors
-                
-            def name(self):
-                return "simple_embedding"
-        
-        self.embedding_function = SimpleEmbeddingFunction()
+        self.embedding_function = _load_embedding_function()
         
         # First try to get the existing collection
         try:
             self.collection = self.client.get_collection(
-                name="conversation_memory"
+                name=_COLLECTION,
+                embedding_function=self.embedding_function
             )
         except Exception:
             # If collection doesn't exist, create it with our embedding function
             try:
                 self.collection = self.client.create_collection(
-                    name="conversation_memory",
-                    metadata={"hnsw:space": "cosine"},
+                    name=_COLLECTION,
+                    metadata=_COLLECTION_METADATA,
                     embedding_function=self.embedding_function
                 )
+                self._migrate_legacy_collection()
             except Exception as e:
                 print(f"Error creating ChromaDB collection: {e}")
                 print("Falling back to in-memory storage...")
                 # Fallback to in-memory client if persistent storage fails
                 self.client = chromadb.Client()
                 self.collection = self.client.create_collection(
-                    "conversation_memory",
+                    _COLLECTION,
+                    metadata=_COLLECTION_METADATA,
                     embedding_function=self.embedding_function
                 )
+        
+        # Vectors of recently embedded texts, shared with the writer thread
+        self._recent_embeddings: "collections.OrderedDict[str, Any]" = collections.OrderedDict()
+        self._embed_lock = threading.Lock()
+        
+        # Semantic cache of chat responses, keyed by the embedded query. Hash-based
+        # vectors carry no meaning, so it is only enabled with a real embedding model
+        self.response_cache = None
+        if not isinstance(self.embedding_function, SimpleEmbeddingFunction):
+            try:
+                self.response_cache = self.client.get_or_create_collection(
+                    name=_RESPONSE_CACHE_COLLECTION,
+                    metadata=_COLLECTION_METADATA,
+                    embedding_function=self.embedding_function
+                )
+            except Exception as e:
+                print(f"Error creating response cache collection: {e}")
+        
+        # Conversations waiting to be written to the collection in one upsert,
+        # shared with the timer thread that bounds how long they wait. Batches
+        # are upserted in order by a single writer thread, off the chat path
+        self._batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._futures = collections.deque(maxlen=256)
+        self._fallback_fh = None
+        self._pending_docs: List[str] = []
+        self._pending_meta: List[Dict[str, str]] = []
+        self._pending_ids: List[str] = []
+        self._pending_lock = threading.RLock()
+        self._flush_timer: Optional[threading.Timer] = None
+        # Save at interpreter exit; a __del__ finalizer is not guaranteed to run
+        atexit.register(self.save)
+        
+        # Rolling summary of older conversations, read from disk on first use
+        self._summary_file = self.persist_directory / "conversation_summary.json"
+        self._summary: Any = _UNLOADED
+    
+    def _migrate_legacy_collection(self) -> None:
+        """Copy conversations from the cosine-space collection into the current one"""
+        try:
+            legacy = self.client.get_collection(_LEGACY_COLLECTION)
+        except _MISSING_COLLECTION_ERRORS:
+            return
+        try:
+            results = legacy.get()
+            # Legacy rows predate 'ts'; derive it from their ISO timestamp so they
+            # keep their order and match the time-windowed history fetch
+            metadatas = [dict(meta or {}) for meta in results['metadatas']]
+            for meta in metadatas:
+                if 'ts' not in meta:
+                    meta['ts'] = _ts_from_timestamp(meta.get('timestamp'))
+            for start in range(0, len(results['ids']), _BATCH_SIZE):
+                documents = results['documents'][start:start + _BATCH_SIZE]
+                self.collection.upsert(
+                    documents=documents,
+                    embeddings=np.asarray(self.embedding_function(documents), dtype=float).tolist(),
+                    metadatas=metadatas[start:start + _BATCH_SIZE],
+                    ids=results['ids'][start:start + _BATCH_SIZE]
+                )
+            if results['ids']:
+                print(f"Migrated {len(results['ids'])} conversations to {_COLLECTION}")
+        except Exception as e:
+            print(f"Error migrating conversation memory: {e}")
+    
+    def _embed(self, texts: List[str]) -> List[Any]:
+        """
+        Embed texts with the memory's embedding function, outside of Chroma
+        
+        Recent vectors are remembered, so a chat message embedded for the semantic
+        cache lookup is not embedded again when its response is cached.
+        """
+        with self._embed_lock:
+            missing = list(dict.fromkeys(t for t in texts if t not in self._recent_embeddings))
+            if missing:
+                # Stored as plain lists: older chromadb releases reject arrays
+                for text, vector in zip(missing, self.embedding_function(missing)):
+                    self._recent_embeddings[text] = np.asarray(vector, dtype=float).tolist()
+            for text in texts:
+                self._recent_embeddings.move_to_end(text)
+            vectors = [self._recent_embeddings[text] for text in texts]
+            while len(self._recent_embeddings) > _RECENT_EMBEDDINGS:
+                self._recent_embeddings.popitem(last=False)
+        return vectors
+    
+    def _random_id(self) -> str:
+        """
+        Generate a random ID: 144 bits as 24 base64url chars
+        
+        IDs are cut from one base64 encoding of a block drawn from a NumPy
+        generator, rather than one os.urandom call and encode per ID; they need
+        uniqueness, not secrecy. 18 bytes encode to exactly 24 chars, so no
+        padding has to be stripped.
+        """
+        try:
+            return self._random_ids.pop()
+        except IndexError:
+            encoded = base64.urlsafe_b64encode(self._rng.bytes(18 * _ID_BATCH)).decode('ascii')
+            fresh = [encoded[i:i + 24] for i in range(0, len(encoded), 24)]
+            conv_id = fresh.pop()
+            # list.extend and list.pop are atomic, so no lock is needed
+            self._random_ids.extend(fresh)
+            return conv_id
     
     def _generate_id(self, text: str) -> str:
-        """Generate a deterministic ID for a text"""
-        return hashlib.sha256(text.encode()).hexdigest()
+        """Generate a deterministic ID for a text: 128 bits of its hash as 22 base64url chars"""
+        return base64.urlsafe_b64encode(_digest(text.encode())[:16]).rstrip(b'=').decode('ascii')
     
-    def _flatten_metadata(self, metadata: Dict[str, Any]) -> Dict[str, str]:
+    def _flatten_metadata(self, metadata: Dict[str, Any]) -> Dict[str, Union[str, int, float, bool]]:
         """
-        Flatten nested metadata into a single level dictionary with string values.
-        Nested dictionaries are converted to JSON strings.
+        Flatten nested metadata into a single level dictionary.
+        Primitives are stored as-is, since Chroma keeps them typed and filterable;
+        nested dictionaries are converted to compact JSON strings.
         """
         flat_metadata = {}
         for key, value in metadata.items():
             if value is None:
                 flat_metadata[key] = ""
             elif isinstance(value, (str, int, float, bool)):
-                flat_metadata[key] = str(value)
+                flat_metadata[key] = value
             else:
                 # Convert complex objects to JSON strings
-                flat_metadata[key] = json.dumps(value)
+                flat_metadata[key] = json.dumps(value, separators=(",", ":"))
         return flat_metadata
 
     def add_conversation(
@@ -116,102 +364,232 @@ class MemoryManager:
         if metadata is None:
             metadata = {}
             
-        # Add timestamp if not provided
+        # Add timestamp if not provided; history is ordered on the integer
+        # epoch milliseconds in 'ts', 'timestamp' is kept for display
         if 'timestamp' not in metadata:
             metadata['timestamp'] = datetime.utcnow().isoformat()
+        metadata.setdefault('ts', int(time.time() * 1000))
             
-        # Generate a unique ID for this conversation
-        conv_id = str(uuid.uuid4())
+        # By default the ID derives from the query and response only, so a
+        # retried or repeated turn overwrites the earlier copy (taking its new
+        # 'ts') instead of adding another
+        if self._id_mode == "random":
+            conv_id = self._random_id()
+        else:
+            conv_id = self._generate_id(f"{query}|{response}")
+        
+        # Flatten metadata for ChromaDB compatibility
+        flat_metadata = self._flatten_metadata({'query': query, **metadata})
         
+        # Buffer the write; the collection is updated in batches. An upsert may
+        # not repeat an ID, so a replay of a buffered turn replaces it
+        with self._pending_lock:
+            if conv_id in self._pending_ids:
+                i = self._pending_ids.index(conv_id)
+                self._pending_docs[i] = response
+                self._pending_meta[i] = flat_metadata
+                return conv_id
+            self._pending_docs.append(response)
+            self._pending_meta.append(flat_metadata)
+            self._pending_ids.append(conv_id)
+            if len(self._pending_ids) >= self._batch_size:
+                self._submit_pending()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(_FLUSH_INTERVAL, self._submit_pending)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        return conv_id
+    
+    def flush(self) -> None:
+        """Write buffered conversations to ChromaDB and wait until all writes are done"""
+        self._submit_pending()
+        # The writer runs batches in order, so the remembered futures cover every
+        # write submitted before this call
+        wait(list(self._futures))
+    
+    def _submit_pending(self) -> None:
+        """Hand the buffered conversations to the writer thread as one batch"""
+        with self._pending_lock:
+            documents, metadatas, ids = self._take_pending()
+            if not ids:
+                return
+            try:
+                self._futures.append(
+                    self._executor.submit(self._upsert_batch, documents, metadatas, ids)
+                )
+            except RuntimeError:
+                # The executor stops taking work at interpreter shutdown,
+                # before the atexit save runs
+                self._upsert_batch(documents, metadatas, ids)
+    
+    def _take_pending(self):
+        """Empty the write buffer, returning its documents, metadatas and ids"""
+        with self._pending_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            pending = (self._pending_docs, self._pending_meta, self._pending_ids)
+            self._pending_docs, self._pending_meta, self._pending_ids = [], [], []
+            return pending
+    
+    def _upsert_batch(self, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]) -> None:
+        """Upsert a batch of conversations, falling back to a JSONL file on failure"""
         try:
-            # Flatten metadata for ChromaDB compatibility
-            flat_metadata = self._flatten_metadata({'query': query, **metadata})
-            
-            # Store in ChromaDB
             self.collection.upsert(
-                documents=[response],
-                metadatas=[flat_metadata],
-                ids=[conv_id]
+                documents=documents,
+                embeddings=self._embed(documents),
+                metadatas=metadatas,
+                ids=ids
             )
-            return conv_id
         except Exception as e:
-            print(f"Error adding conversation to memory: {e}")
-            # Fallback to simple file-based storage if Chroma fails
+            print(f"Error adding conversations to memory: {e}")
+            # Fallback to simple file-based storage if Chroma fails. The file
+            # stays open with a large buffer and is flushed by save()
             try:
-                memory_file = self.persist_directory / "fallback_memory.jsonl"
-                with open(memory_file, 'a', encoding='utf-8') as f:
-                    f.write(json.dumps({
+                if self._fallback_fh is None:
+                    memory_file = self.persist_directory / "fallback_memory.jsonl"
+                    self._fallback_fh = open(memory_file, 'ab', buffering=65536)
+                for conv_id, response, metadata in zip(ids, documents, metadatas):
+                    metadata = dict(metadata)
+                    self._fallback_fh.write(_dumps({
                         'id': conv_id,
-                        'query': query,
+                        'query': metadata.pop('query', ''),
                         'response': response,
                         'metadata': metadata
-                    }) + '\n')
-                return conv_id
+                    }) + b'\n')
             except Exception as fallback_error:
                 print(f"Fallback storage also failed: {fallback_error}")
-                return ""
     
     def search_memory(
         self, 
-        query: str, 
+        query: Union[str, List[str]], 
         n_results: int = 5
-    ) -> List[Dict[str, Any]]:
-        """Search through conversation history"""
+    ) -> Union[List[Dict[str, Any]], List[List[Dict[str, Any]]]]:
+        """
+        Search through conversation history
+        
+        Args:
+            query: A query, or several queries to run in a single Chroma call
+            n_results: Maximum number of results per query (at most 10)
+            
+        Returns:
+            The matches for `query`, or one list of matches per query when a list is given
+        """
+        queries = [query] if isinstance(query, str) else list(query)
+        self.flush()
         try:
+            if not queries:
+                return []
             results = self.collection.query(
-                query_texts=[query],
+                query_embeddings=self._embed(queries),
                 n_results=min(n_results, 10)  # Limit to 10 results max
             )
             
             # Format results
             formatted_results = []
-            for i in range(len(results['ids'][0])):
-                formatted_results.append({
-                    'id': results['ids'][0][i],
-                    'document': results['documents'][0][i],
-                    'metadata': results['metadatas'][0][i],
-                    'distance': results['distances'][0][i]
-                })
+            for q in range(len(queries)):
+                formatted_results.append([
+                    {
+                        'id': results['ids'][q][i],
+                        'document': results['documents'][q][i],
+                        'metadata': results['metadatas'][q][i],
+                        'distance': results['distances'][q][i]
+                    }
+                    for i in range(len(results['ids'][q]))
+                ])
             
-            return formatted_results
+            return formatted_results[0] if isinstance(query, str) else formatted_results
             
         except Exception as e:
             print(f"Error searching memory: {e}")
-            return []
+            return [] if isinstance(query, str) else [[] for _ in queries]
     
-    def get_conversation_history(self, limit: int = 10) -> List[Dict[str, Any]]:
+    def lookup_semantic(self, query: str, threshold: float = 0.1) -> Optional[str]:
         """
-        Get recent conversation history
+        Look up a cached response for a query similar to one answered before
         
         Args:
-            limit: Maximum number of conversations to return
+            query: User's query/message
+            threshold: Maximum distance (1 - cosine similarity) for a cached query to count as a match
             
         Returns:
-            List[Dict[str, Any]]: List of conversation items with id, query, response, and timestamp
+            Optional[str]: The cached response, or None on a miss
         """
+        if self.response_cache is None:
+            return None
         try:
-            # Get all items
-            results = self.collection.get()
-            if not results['ids']:
+            results = self.response_cache.query(
+                query_embeddings=self._embed([query]),
+                n_results=1
+            )
+            if results['ids'][0] and results['distances'][0][0] < threshold:
+                # An empty cached response is not an answer; treat it as a miss
+                return results['metadatas'][0][0].get('response') or None
+        except Exception as e:
+            print(f"Error searching response cache: {e}")
+        return None
+    
+    def cache_response(self, query: str, response: str) -> None:
+        """Store a response in the semantic cache under its query"""
+        if self.response_cache is None:
+            return
+        try:
+            self.response_cache.upsert(
+                documents=[query],
+                embeddings=self._embed([query]),
+                metadatas=[{'response': response}],
+                ids=[self._generate_id(query)]
+            )
+        except Exception as e:
+            print(f"Error caching response: {e}")
+    
+    def get_conversation_history(self, limit: Optional[int] = 10, since: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get recent conversation history, newest first
+        
+        Args:
+            limit: Maximum number of conversations to return, or None for all of them
+            since: Only return conversations with a 'ts' after this one
+            
+        Returns:
+            List[Dict[str, Any]]: List of conversation items with id, query, response, timestamp and ts
+        """
+        # Read buffered turns alongside the stored ones instead of flushing, so
+        # reading history does not force a write on every chat turn. Snapshot the
+        # buffer first: a batch submitted after that is covered by the wait below
+        with self._pending_lock:
+            pending = list(zip(self._pending_ids, self._pending_docs, self._pending_meta))
+        wait(list(self._futures))
+        try:
+            if since is not None:
+                results = self.collection.get(where={'ts': {'$gt': since}})
+                pending = [row for row in pending if int(row[2].get('ts', 0)) > since]
+            elif limit is None:
+                results = self.collection.get()
+            else:
+                results = self._get_recent(limit)
+            rows = dict(zip(results['ids'], zip(results['documents'], results['metadatas'])))
+            rows.update((doc_id, (doc, meta)) for doc_id, doc, meta in pending)
+            if not rows:
                 return []
                 
-            # Sort by timestamp (newest first)
-            items = sorted(
-                zip(results['ids'], results['documents'], results['metadatas']),
-                key=lambda x: x[2].get('timestamp', ''),
-                reverse=True
-            )
+            # Keep only the newest items, without sorting the whole collection
+            rows = ((doc_id, doc, meta) for doc_id, (doc, meta) in rows.items())
+            key = lambda x: (int(x[2].get('ts', 0)), x[2].get('timestamp', ''))
+            if limit is None:
+                items = sorted(rows, key=key, reverse=True)
+            else:
+                items = heapq.nlargest(limit, rows, key=key)
             
-            # Format and limit results
+            # Format results
             history = []
-            for i, (doc_id, doc, meta) in enumerate(items):
-                if i >= limit:
-                    break
+            for doc_id, doc, meta in items:
                 history.append({
                     'id': doc_id,
                     'query': meta.get('query', ''),
                     'response': doc,
-                    'timestamp': meta.get('timestamp', '')
+                    'timestamp': meta.get('timestamp', ''),
+                    'ts': int(meta.get('ts', 0))
                 })
             
             return history
@@ -220,10 +598,87 @@ class MemoryManager:
             print(f"Error getting conversation history: {e}")
             return []
     
+    def _get_recent(self, limit: int) -> Dict[str, Any]:
+        """
+        Get at least the `limit` newest conversations, filtering on 'ts' in Chroma
+        
+        The time window starts at a day and widens until it holds enough items, so
+        a typical call transfers only recent rows instead of the whole collection.
+        """
+        wanted = min(limit, self.collection.count())
+        if wanted == 0:
+            return {'ids': [], 'documents': [], 'metadatas': []}
+        
+        now = int(time.time() * 1000)
+        window = _HISTORY_WINDOW_MS
+        while True:
+            cutoff = now - window
+            results = self.collection.get(where={'ts': {'$gte': cutoff}})
+            if len(results['ids']) >= wanted or cutoff <= 0:
+                break
+            window *= 8
+        
+        if len(results['ids']) < wanted:
+            # Conversations stored before 'ts' existed never match the filter
+            results = self.collection.get()
+        return results
+    
+    def get_summary(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the rolling summary of the conversation
+        
+        Returns:
+            Optional[Dict[str, Any]]: The summary text under 'summary' and the ts of the
+            newest conversation it covers under 'ts', or None if nothing was summarized yet
+        """
+        if self._summary is _UNLOADED:
+            try:
+                with open(self._summary_file, 'r', encoding='utf-8') as f:
+                    self._summary = json.load(f)
+            except FileNotFoundError:
+                self._summary = None
+            except Exception as e:
+                print(f"Error loading conversation summary: {e}")
+                self._summary = None
+        return self._summary
+    
+    def update_summary(self, summary: str, ts: int) -> None:
+        """
+        Replace the rolling summary of the conversation
+        
+        Args:
+            summary: Summary of the conversation up to and including the conversation at `ts`
+            ts: ts of the newest conversation covered by the summary
+        """
+        self._summary = {'summary': summary, 'ts': ts}
+        try:
+            # Write then rename so a reader never sees a partial file
+            tmp_file = self._summary_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._summary, f)
+            tmp_file.replace(self._summary_file)
+        except Exception as e:
+            print(f"Error saving conversation summary: {e}")
+    
     def clear_memory(self) -> bool:
         """Clear all conversation memory"""
+        self._take_pending()
+        # A batch still being written must not land in the recreated collection
+        wait(list(self._futures))
+        self._summary = None
         try:
-            self.collection.delete(where={})  # Delete all items
+            self._summary_file.unlink(missing_ok=True)
+            # Dropping the collection is a single metadata operation, unlike
+            # deleting every row from the index
+            try:
+                self.client.delete_collection(_COLLECTION)
+            except _MISSING_COLLECTION_ERRORS:
+                pass
+            self.collection = self.client.get_or_create_collection(
+                name=_COLLECTION,
+                metadata=_COLLECTION_METADATA,
+                embedding_function=self.embedding_function
+            )
             return True
         except Exception as e:
             print(f"Error clearing memory: {e}")
@@ -231,15 +686,35 @@ class MemoryManager:
     
     def save(self) -> bool:
         """Persist the memory to disk"""
+        self.flush()
         try:
             # Persistence is handled automatically in the new API
             # Just ensure the directory exists
             self.persist_directory.mkdir(parents=True, exist_ok=True)
+            if self._fallback_fh is not None:
+                self._fallback_fh.flush()
             return True
         except Exception as e:
             print(f"Error saving memory: {e}")
             return False
     
-    def __del__(self):
-        """Ensure data is saved when the object is destroyed"""
+    def __enter__(self) -> "MemoryManager":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        """Close the memory when leaving a `with` block"""
+        self.close()
+    
+    def close(self) -> None:
+        """
+        Save buffered conversations and stop the writer thread
+        
+        The manager is not meant to be used after closing; later writes are
+        still upserted, but on the calling thread and without the exit-time save.
+        """
         self.save()
+        atexit.unregister(self.save)
+        self._executor.shutdown(wait=True)
+        if self._fallback_fh is not None:
+            self._fallback_fh.close()
+            self._fallback_fh = None
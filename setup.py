@@ -1,18 +1,34 @@
 import os
+import re
 from setuptools import setup, find_packages
 
 # Read the contents of README.md
 with open("README.md", "r", encoding="utf-8") as fh:
     long_description = fh.read()
 
-# Read requirements from requirements.txt
-def get_requirements():
-    with open("requirements.txt", "r", encoding="utf-8") as f:
-        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+# Read the version from the package without importing it
+def get_version():
+    with open(os.path.join("repo_surfer", "__init__.py"), "r", encoding="utf-8") as f:
+        return re.search(r'^__version__ = "([^"]+)"', f.read(), re.M).group(1)
+
+# Read requirements from requirements.txt, the single source of truth for
+# install_requires; comments, blank lines and pip options (-r, -e, --index-url)
+# are skipped
+def get_requirements(path="requirements.txt"):
+    requirements = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split(" #", 1)[0].strip()
+            if line and not line.startswith(("#", "-")):
+                requirements.append(line)
+    return requirements
+
+# Parsed once; setuptools may evaluate the metadata more than once
+REQUIREMENTS = get_requirements()
 
 setup(
     name="repo-surfer",
-    version="0.1.0",
+    version=get_version(),
     author="Your Name",
     author_email="your.email@example.com",
     description="A terminal-based AI agent for GitHub repository analysis and exploration",
@@ -42,8 +58,13 @@ setup(
         "Typing :: Typed",
     ],
     python_requires='>=3.8',
-    install_requires=get_requirements(),
+    install_requires=REQUIREMENTS,
     extras_require={
+        # Optional embedding backend for conversation memory; Chroma's bundled
+        # ONNX model is used first, so this is only needed where it can't load
+        'ml': [
+            'sentence-transformers>=2.2.2',
+        ],
         'dev': [
             'pytest>=7.0.0',
             'pytest-cov>=4.0.0',